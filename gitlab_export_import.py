@@ -15,7 +15,8 @@ Arguments:
   directory         Folder for export files.
 
 Options:
-  --delay=SEC       Refresh delay for Gitlab status querying [default: 15].
+  --delay=SEC       Max. refresh delay for Gitlab status querying [default: 15].
+  --force           Export again even if already exported files exist.
   -h --help         Show this screen.
   --logfile=FILE    Logging to FILE, otherwise use STDOUT.
   --no-color        No colored log output.
@@ -47,21 +48,33 @@ Options:
 import json
 import logging
 import os
+import random
+import re
+import signal
 import sys
-from fnmatch import fnmatch
-from glob import iglob
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from fnmatch import translate
 from pathlib import Path
-from time import sleep
-from typing import Union
+from typing import Callable, Dict, List, Set, Union
 
 import colorlog
+import requests
 import urllib3
 from docopt import docopt
 # https://pypi.org/project/python-gitlab/
 # https://python-gitlab.readthedocs.io/en/stable/
 from gitlab import Gitlab
 from gitlab.exceptions import GitlabError, GitlabGetError
-from gitlab.v4.objects import Group, Project
+from gitlab.v4.objects import Group, GroupProject, Project
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try:
+    # optional, faster JSON (de-)serialization
+    import orjson
+except ImportError:
+    orjson = None
 
 __appname__ = "gitlab_export_import"
 __version__ = "1.0.0"
@@ -73,6 +86,10 @@ __license__ = "AGPL-3.0+"
 
 LOGGING_STREAM = sys.stdout
 DEBUG = bool(os.environ.get("DEBUG", "").lower() in ("1", "true", "yes"))
+# number of parallel export/import jobs
+CONCURRENCY = int(os.environ.get("GEI_CONCURRENCY", "8"))
+# number of parallel project uploads (Gitlab rate-limits the import endpoint)
+IMPORT_CONCURRENCY = int(os.environ.get("GEI_IMPORT_CONCURRENCY", "4"))
 
 # check for Python3
 if sys.version_info < (3, 8):
@@ -86,40 +103,70 @@ class GitlabImportExport:
     METADATA_FILENAME = "metadata.json"
     FILENAME_PATTERN_GROUP = "group_*.tar.gz"
     FILENAME_PATTERN_PROJECT = "project_*.tar.gz"
-
-    def __init__(self, gl: Gitlab, export_folder: Path, delay_seconds: float = 15):
+    _RE_GROUP = re.compile(translate(FILENAME_PATTERN_GROUP))
+    _RE_PROJECT = re.compile(translate(FILENAME_PATTERN_PROJECT))
+    # write buffer for downloads, coalescing the network chunks into large writes
+    DOWNLOAD_BUFFER_SIZE = 1 << 20
+    # read size for streamed downloads (python-gitlab's default is just 1 KiB)
+    DOWNLOAD_CHUNK_SIZE = 1 << 18
+
+    def __init__(self, gl: Gitlab, export_folder: Path, delay_seconds: float = 15,
+                 force: bool = False):
         """Import and export of Gitlab groups and projects."""
         self.gl = gl
         assert delay_seconds >= 1, "Delay between download checks must be a meaningful duration!"
         self.delay_seconds = delay_seconds
         self.export_folder = export_folder
+        # export again, even if the files from a previous (failed) run exist
+        self.force = force
+        self._pool = ThreadPoolExecutor(max_workers=CONCURRENCY)
+        self._import_slots = threading.BoundedSemaphore(IMPORT_CONCURRENCY)
+        # set to stop all waiting and pending jobs
+        self._stop = threading.Event()
 
     def exporting(self, gitlab_path: str):
         """Recursive export of Gitlab groups and projects."""
-        # 1. export root group
-        group = self._export_group(gitlab_path)
-        # 2. export projects inside root group
-        self._export_projects(group)
-        # 3. recursively export subprojects (and their projects)
-        self._export_subprojects_recursive(group)
+        group = self.get_group(gitlab_path)
+        logging.debug("group to export: %s", group)
+        if not group:
+            raise RuntimeError(f"No such group: {gitlab_path}")
+
+        # output path: exportfolder/date_time/maingroup/.../
+        output_path = self.export_folder.joinpath(group.path)
+        logging.debug("creating output path '%s' ...", output_path.resolve())
+        os.makedirs(output_path, exist_ok=True)
+
+        # 1. export root group (in the background, the project exports do not depend on it)
+        futures = [self._pool.submit(self._export_group, group, output_path)]
+        # 2. export projects inside root group and all subgroups (and their projects)
+        self._export_group_tree(group, output_path, futures)
+        # the first failing export (group or project) stops all the others
+        self._wait_all(futures)
 
     # -------------------------------------------------------------------------
     # Export
     # -------------------------------------------------------------------------
 
-    def export_project(self, project: Project, output_path: Path = None):
+    def export_project(self, project: Union[Project, GroupProject], output_path: Path):
         """Export a project and download it to the filesystem."""
-        assert isinstance(project, Project)
-        if not output_path:
-            # the initial main-group export takes the initial class-level output path
-            output_path = self.export_folder
+        assert isinstance(project, (Project, GroupProject))
+        self._check_stopped()
+
+        # project.path is just the plain single path-component, not the full_path
+        output_filepath_project = output_path.joinpath(f"project_{project.path}.tar.gz")
+        output_filepath_metadata = self.__get_filepath_project_metadata(output_filepath_project)
+        if self._is_exported(output_filepath_project, output_filepath_metadata):
+            logging.info("Skipping already exported project '%s'", project.path_with_namespace)
+            return
 
         logging.info("Project export for '%s' (%d, '%s')...",
                      project.path_with_namespace, project.id, project.name)
 
         # initiate the export process
         try:
-            exporter = project.exports.create()
+            # a group's project-object has no exports manager, but a lazy project has one
+            # (the attributes are all taken from the given project-object, no need to fetch it)
+            exporter = self.gl.projects.get(project.id, lazy=True).exports.create()
             # a first refresh() is needed to fill the exporter object with all attributes
             exporter.refresh()
         except GitlabError as ex:
@@ -129,35 +176,39 @@ class GitlabImportExport:
 
         # wait till the download is ready
         try:
-            while exporter and exporter.export_status != 'finished':
-                logging.debug("waiting %.1f seconds till next status update...", self.delay_seconds)
-                sleep(self.delay_seconds)
-                exporter.refresh()
+            self._wait_until(lambda: exporter.export_status == 'finished', exporter.refresh)
             logging.debug("exporter: %s", exporter)
         except GitlabError as ex:
             logging.error("Problem getting status for '%s': %s", project.path, ex.error_message)
             return
 
-        # project.path is just the plain single path-component, not the full_path
-        output_filepath_project = output_path.joinpath(f"project_{project.path}.tar.gz")
         logging.info("Downloading export for '%s': %s",
                      project.path, output_filepath_project.resolve())
+        # download to a temporary name, a partial archive must never be taken as an export
+        output_filepath_part = output_filepath_project.with_name(
+            f"{output_filepath_project.name}.part")
         try:
-            with output_filepath_project.open("wb") as fout:
-                exporter.download(streamed=True, action=fout.write)
-                logging.info("Download finished for '%s'", project.path)
+            with output_filepath_part.open("wb", buffering=self.DOWNLOAD_BUFFER_SIZE) as fout:
+                exporter.download(streamed=True, action=fout.write,
+                                  chunk_size=self.DOWNLOAD_CHUNK_SIZE)
+            output_filepath_part.replace(output_filepath_project)
+            logging.info("Download finished for '%s'", project.path)
         except Exception as ex:
             logging.exception("Problem while downloading: %s", ex, exc_info=ex)
+            # no metadata file, i.e., the export is not considered done
+            return
+        finally:
+            output_filepath_part.unlink(missing_ok=True)
 
         # create project metadata file
-        self._write_metadata_file(
-            project, self.__get_filepath_project_metadata(output_filepath_project))
+        self._write_metadata_file(project, output_filepath_metadata)
 
-    def _export_group(self, gitlab_path: str) -> Group:
-        group = self.get_group(gitlab_path)
-        logging.debug("group to export: %s", group)
-        if not group:
-            raise RuntimeError(f"No such group: {gitlab_path}")
+    def _export_group(self, group: Group, output_path: Path):
+        # Gitlab sends the export as tar.gz archive
+        output_file = output_path.joinpath(f"group_{group.path}.tar.gz")
+        if self._is_exported(output_file, self.__get_filepath_group_metadata(output_path)):
+            logging.info("Skipping already exported group '%s'", group.full_path)
+            return
 
         logging.info("Creating group export for '%s' (path '%s') ...", group.name, group.path)
         exporter = None
@@ -171,62 +222,66 @@ class GitlabImportExport:
         # give it some time to do the export
         # (exporting groups is fast because only metadata, no projects etc.)
         logging.debug("waiting %.1f seconds (delay time)...", self.delay_seconds)
-        sleep(self.delay_seconds)
+        self._sleep(self.delay_seconds)
 
-        # modify output path: exportfolder/date_time/maingroup/.../
-        self.export_folder = self.export_folder.joinpath(group.path)
-        logging.debug("creating output path '%s' ...", self.export_folder.resolve())
-        os.makedirs(self.export_folder, exist_ok=True)
-
-        # Gitlab sends the export as tar.gz archive
-        output_file = self.export_folder.joinpath(f"group_{group.path}.tar.gz")
         logging.info("Downloading group export to '%s' ...", output_file.resolve())
-        with output_file.open("wb") as fout:
-            exporter.download(streamed=True, action=fout.write)
+        with output_file.open("wb", buffering=self.DOWNLOAD_BUFFER_SIZE) as fout:
+            exporter.download(streamed=True, action=fout.write,
+                              chunk_size=self.DOWNLOAD_CHUNK_SIZE)
 
         # write group metadata file
-        self._write_metadata_file(group, self.__get_filepath_group_metadata(self.export_folder))
+        self._write_metadata_file(group, self.__get_filepath_group_metadata(output_path))
 
         logging.info("Group export finished for '%s' (%s)", group.path, exporter.message)
-        return group
 
-    def _export_projects(self, group: Group, output_path: Path = None):
+    def _export_projects(self, group: Group, output_path: Path) -> List[Future]:
         assert isinstance(group, Group)
-        if not output_path:
-            # the initial main-group export takes the initial class-level output path
-            output_path = self.export_folder
-
-        projects = group.projects.list(all=True)
-        logging.info("#%d projects in '%s'", len(projects), group.full_path)
-        for project in projects:
-            # the project-object is a lazy proxy object - get the real one
-            project_full_obj = self.gl.projects.get(project.id)
-            self.export_project(project_full_obj, output_path)
-
-    def _export_subprojects_recursive(self, group: Group, output_path: Path = None):
+        # paging iterator, the exports start while the next pages are being fetched
+        projects = group.projects.list(iterator=True, per_page=100)
+        logging.info("#%s projects in '%s'", projects.total, group.full_path)
+        # the project exports are running in parallel, each one mostly waiting for Gitlab
+        return [
+            self._pool.submit(self.export_project, project, output_path)
+            for project in projects
+        ]
+
+    def _export_group_tree(self, group: Group, output_path: Path, futures: List[Future]):
+        """Export the projects of a group and of all its subgroups (work-queue, no recursion).
+
+        The export jobs are appended to futures, the caller waits for them.
+        """
         assert isinstance(group, Group)
-        if not output_path:
-            # the initial main-group export takes the initial class-level output path
-            output_path = self.export_folder
+        try:
+            self.__traverse_group_tree(group, output_path, futures)
+        except BaseException:
+            self._cancel_all(futures)
+            raise
+
+    def __traverse_group_tree(self, group: Group, output_path: Path, futures: List[Future]):
+        queue = deque([(group, output_path)])
+        while queue:
+            self._check_stopped()
+            group, output_path = queue.popleft()
 
-        subgroups = group.subgroups.list()
-        for subgroup in subgroups:
-            # the subgroup-object is a lazy proxy object - get the real one
-            subgroup_full_obj = self.gl.groups.get(subgroup.id)
+            # shallow (only the projects in current group), exporting in the background
+            futures.extend(self._export_projects(group, output_path))
 
-            # create subdir for subgroup
-            output_path_subdir = output_path.joinpath(subgroup_full_obj.path)
-            os.makedirs(output_path_subdir, exist_ok=True)
+            subgroups = group.subgroups.list(iterator=True, per_page=100)
+            for subgroup in subgroups:
+                # the subgroup-object is a lazy proxy object - get the real one
+                subgroup_full_obj = self.gl.groups.get(subgroup.id)
 
-            # create group metadata file
-            self._write_metadata_file(subgroup_full_obj,
-                                      self.__get_filepath_group_metadata(output_path_subdir))
+                # create subdir for subgroup
+                output_path_subdir = output_path.joinpath(subgroup_full_obj.path)
+                os.makedirs(output_path_subdir, exist_ok=True)
 
-            # shallow call (only the projects in current group)
-            self._export_projects(subgroup_full_obj, output_path_subdir)
+                # create group metadata file (in the background, the traversal continues)
+                futures.append(self._pool.submit(
+                    self._write_metadata_file, subgroup_full_obj,
+                    self.__get_filepath_group_metadata(output_path_subdir)))
 
-            # recursive call (subgroups and sub-projects)
-            self._export_subprojects_recursive(subgroup_full_obj, output_path_subdir)
+                # subgroups and sub-projects
+                queue.append((subgroup_full_obj, output_path_subdir))
 
     # -------------------------------------------------------------------------
     # Export
@@ -234,19 +289,49 @@ class GitlabImportExport:
 
     def importing(self, gitlab_path: str, no_groups: bool = False):
         """Import Gitlab group and project exports (by this very script) into Gitlab."""
+        # one pass over the export folder tree, shared by the group and project imports
+        tree = self._scan_export_tree(self.export_folder)
+        if not tree[self.export_folder]["meta"]:
+            raise RuntimeError(f"Path has no metadata file '{self.METADATA_FILENAME}'!")
+        metadata = self._read_metadata_file(tree[self.export_folder]["meta"])
+
         if not no_groups:
-            result = self._import_groups(gitlab_path)
+            result = self._import_groups(tree, metadata, gitlab_path)
             if not result:
                 return
-        self._import_projects(gitlab_path)
+        # path_with_namespace (lowercase) of the already existing projects on the Gitlab server
+        existing = self._get_existing_projects(metadata["path"], gitlab_path)
+        self._import_projects(tree, metadata["path"], existing, gitlab_path)
 
-    def import_project(self, filepath: Path, name: str, slug, namespace: str):
-        """Import project archive into Gitlab."""
-        # do the import by sending the file content as binary data stream
-        import_id = self.__import_project_upload(filepath, name, slug, namespace)
-        if import_id:
-            # ask the ProjectImportManager for the status and wait till it's done
-            self.__import_project_wait_done(import_id)
+    def _get_existing_projects(self, main_group_path: str, gitlab_root: str = "") -> Set[str]:
+        """Get all already existing projects below the main group with one paged listing."""
+        main_group_namespace = main_group_path
+        if gitlab_root:
+            main_group_namespace = f"{gitlab_root}/{main_group_path}"
+        group = self.get_group(main_group_namespace)
+        if not group:
+            return set()
+        # Gitlab paths are case-insensitive
+        existing = {
+            project.path_with_namespace.lower()
+            for project in group.projects.list(include_subgroups=True, iterator=True,
+                                               simple=True, per_page=100)
+        }
+        logging.debug("#%d projects already existing in '%s'", len(existing), main_group_namespace)
+        return existing
+
+    def import_project(self, filepath: Path, name: str, slug, namespace: str) -> bool:
+        """Import project archive into Gitlab, returns True if the import finished."""
+        # limit the number of parallel uploads to respect Gitlab's rate limits,
+        # the status polling does not hold a slot so that the next upload can start
+        with self._import_slots:
+            self._check_stopped()
+            # do the import by sending the file content as binary data stream
+            import_id = self.__import_project_upload(filepath, name, slug, namespace)
+        if not import_id:
+            return False
+        # ask the ProjectImportManager for the status and wait till it's done
+        return self.__import_project_wait_done(import_id)
 
     def __import_project_upload(self, filepath: Path, name: str, slug, namespace: str):
         """Do the import by sending the file content as binary data stream."""
@@ -267,71 +352,67 @@ class GitlabImportExport:
         """Ask the ProjectImportManager for the status and wait till it's done."""
         try:
             importer = self.gl.projects.get(import_id, lazy=True).imports.get()
-            while importer.import_status != "finished":
-                logging.debug("waiting %.1f seconds till next status update...", self.delay_seconds)
-                sleep(self.delay_seconds)
-                importer.refresh()
+            self._wait_until(lambda: importer.import_status == "finished", importer.refresh)
             logging.debug("project_import_job: %s", importer)
             logging.info("Import finished of '%s'", importer.path_with_namespace)
+            return True
         except GitlabError as ex:
             logging.exception("Problem importing project: %s", ex.error_message, exc_info=ex)
+        return False
 
-    def _import_project(self, filepath: Path, namespace: str):
+    def _import_project(self, filepath: Path, namespace: str, size_bytes: int, existing: Set[str]):
         """Import project from archive file, reading parameters from metadata file."""
-        metadata = self._read_metadata_file(self.__get_filepath_project_metadata(filepath))
+        self._check_stopped()
+        metadata_filepath = self.__get_filepath_project_metadata(filepath)
+        if not metadata_filepath.exists():
+            logging.warning("Skipping project archive without metadata file: %s", filepath)
+            return
+        metadata = self._read_metadata_file(metadata_filepath)
         slug = metadata["path"]
         name = metadata["name"]
         path_with_namespace = f"{namespace}/{slug}"
         logging.debug("project.path_with_namespace: %s", path_with_namespace)
 
-        if self.get_project(path_with_namespace):
+        if path_with_namespace.lower() in existing:
             logging.warning("Skipping already existing project: %s", path_with_namespace)
             return
 
-        logging.info("Importing project '%s' (%d MB) to '%s' ...",
-                     name, filepath.stat().st_size / 1024.0 / 1024.0, path_with_namespace)
-        self.import_project(filepath, name, slug, namespace)
+        logging.info("Importing project '%s' (%d MiB) to '%s' ...",
+                     name, size_bytes >> 20, path_with_namespace)
+        if self.import_project(filepath, name, slug, namespace):
+            # the project exists now
+            existing.add(path_with_namespace.lower())
 
-    def _import_projects(self, gitlab_root: str = ""):
+    def _import_projects(self, tree: Dict[Path, dict], main_group_path: str, existing: Set[str],
+                         gitlab_root: str = ""):
         """Import Gitlab projects from a folder structure."""
-        # path-component name of this group (not the whole namespace), e.g., just "mysubgroup1"
-        main_group_path = self._read_metadata_file(
-            self.__get_filepath_group_metadata(self.export_folder))["path"]
+        # main_group_path is the path-component name of this group (not the whole namespace),
+        # e.g., just "mysubgroup1"
         logging.debug("main_group_path: %s", main_group_path)
 
-        logging.debug("Scanning for project export archives in '%s' ...",
-                      self.export_folder.resolve())
-        for root, _, files in os.walk(self.export_folder):
-            logging.debug("Handling folder '%s' ...", Path(root).resolve())
-
-            # make root relative to the export_folder (strip export_folder from the front)
-            root_relative = Path(root).relative_to(self.export_folder)
-            # rootgroupname/subgroup1/subgroup2  (main_group + subgroups)
-            namespace = str(Path(main_group_path).joinpath(root_relative))
-            # make sure it's all '/' in paths/namespaces, not '\', needed for MS Windows
-            namespace = namespace.replace("\\", "/")
+        futures = []
+        for folder, content in tree.items():
+            self._check_stopped()
+            if not content["project_archives"]:
+                continue
+            # rootgroupname/subgroup1/subgroup2  (main_group + subgroups),
+            # always with '/' in paths/namespaces, not '\', needed for MS Windows
+            namespace = Path(main_group_path).joinpath(
+                folder.relative_to(self.export_folder)).as_posix()
 
             # prepend user-specified Gitlab root (if given on CLI)
             if gitlab_root:
                 namespace = f"{gitlab_root}/{namespace}"
 
             logging.debug("namespace: %s", namespace)
+            for filepath, size_bytes in content["project_archives"]:
+                futures.append(self._pool.submit(self._import_project,
+                                                 filepath, namespace, size_bytes, existing))
 
-            for filename in files:
-                if fnmatch(filename, "*.json") or fnmatch(filename, self.FILENAME_PATTERN_GROUP):
-                    continue
-                if not fnmatch(filename, self.FILENAME_PATTERN_PROJECT):
-                    logging.warning("Skipping non-project archive: %s", filename)
-                    continue
-
-                filepath = Path(root).joinpath(filename)
-                self._import_project(filepath, namespace)
+        self._wait_all(futures)
 
-    def _import_groups(self, gitlab_root: str = ""):
+    def _import_groups(self, tree: Dict[Path, dict], metadata: dict, gitlab_root: str = ""):
         """Import groups from export file."""
-        self.__check_is_export_folder(self.export_folder)
-
-        metadata = self._read_metadata_file(self.__get_filepath_group_metadata(self.export_folder))
         main_group_name = metadata["name"]
         main_group_path = metadata["path"]
 
@@ -357,11 +438,12 @@ class GitlabImportExport:
             logging.info("Importing group '%s' with path '%s' ...",
                          main_group_name, main_group_path)
 
-        # get first "group_*.tar.gz" file
-        export_file = self.__get_group_exportfile(self.export_folder)
-        logging.debug("group export_file: %s", export_file)
+        # first "group_*.tar.gz" file
+        export_filepath = tree[self.export_folder]["group_archive"]
+        logging.debug("group export_file: %s", export_filepath)
+        if not export_filepath:
+            raise RuntimeError(f"Path has no group export file '{self.FILENAME_PATTERN_GROUP}'!")
 
-        export_filepath = Path(export_file)
         logging.info("Loading from file '%s' ...", export_filepath)
         with export_filepath.open("rb") as fin:
             self.gl.groups.import_group(fin, path=main_group_path, name=main_group_name,
@@ -375,6 +457,10 @@ class GitlabImportExport:
     # Helpers
     # -------------------------------------------------------------------------
 
+    def stop(self):
+        """Stop all running exports/imports at their next status check."""
+        self._stop.set()
+
     def get_project(self, path_with_namespace: str) -> Union[Project, None]:
         """Get the Gitlab data object for a project."""
         try:
@@ -394,6 +480,57 @@ class GitlabImportExport:
     # Internal
     # -------------------------------------------------------------------------
 
+    def _is_exported(self, archive_filepath: Path, metadata_filepath: Path) -> bool:
+        """Check if the archive and its metadata file already exist (from a previous run)."""
+        if self.force:
+            return False
+        if not archive_filepath.exists() or archive_filepath.stat().st_size == 0:
+            return False
+        return metadata_filepath.exists()
+
+    def _wait_all(self, futures: List[Future]):
+        """Wait for all jobs, on any error stop and cancel the pending ones."""
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except BaseException as ex:
+            self._cancel_all(futures, raised=ex)
+            raise
+
+    def _cancel_all(self, futures: List[Future], raised: BaseException = None):
+        """Stop and cancel all pending jobs, logging the failures of the already finished ones."""
+        # otherwise the queued jobs would still all be run at interpreter exit
+        self._stop.set()
+        for future in futures:
+            if future.cancel() or not future.done():
+                continue
+            ex = future.exception()
+            if ex is not None and ex is not raised and not isinstance(ex, KeyboardInterrupt):
+                logging.error("Job failed: %r", ex)
+
+    def _check_stopped(self):
+        if self._stop.is_set():
+            raise KeyboardInterrupt
+
+    def _sleep(self, seconds: float):
+        """Sleep, but wake up (and abort) immediately when stopped."""
+        if self._stop.wait(seconds):
+            raise KeyboardInterrupt
+
+    def _wait_until(self, predicate: Callable[[], bool], refresh: Callable[[], None],
+                    initial: float = 1.0, cap: float = None):
+        """Poll with exponential backoff (and jitter) till the predicate is true."""
+        if cap is None:
+            cap = self.delay_seconds
+        delay = min(initial, cap)
+        while not predicate():
+            # jitter avoids that parallel jobs are all polling at the same time
+            delay_jitter = delay * random.uniform(0.8, 1.2)
+            logging.debug("waiting %.1f seconds till next status update...", delay_jitter)
+            self._sleep(delay_jitter)
+            refresh()
+            delay = min(delay * 2, cap)
+
     def __get_filepath_group_metadata(self, path: Path) -> Path:
         return path.joinpath(self.METADATA_FILENAME)
 
@@ -401,13 +538,30 @@ class GitlabImportExport:
     def __get_filepath_project_metadata(path: Path) -> Path:
         return path.with_name(f"{path.name}.json")
 
-    def __check_is_export_folder(self, path: Path):
-        if not self.__get_filepath_group_metadata(path).exists():
-            raise RuntimeError(f"Path has no metadata file '{self.METADATA_FILENAME}'!")
-
-    @staticmethod
-    def __get_group_exportfile(path: Path):
-        return next(iglob(str(path.joinpath("group_*.tar.gz").resolve())))
+    def _scan_export_tree(self, root: Path) -> Dict[Path, dict]:
+        """Scan the export folder tree once, collecting metadata files and archives per folder."""
+        logging.debug("Scanning for export files in '%s' ...", root.resolve())
+        tree = {}
+        folders = [root]
+        while folders:
+            folder = folders.pop()
+            content = {"meta": None, "group_archive": None, "project_archives": []}
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    # DirEntry has the file type cached, no extra stat() calls needed
+                    # (symlinked folders are not followed, like os.walk() does by default)
+                    if entry.is_dir(follow_symlinks=False):
+                        folders.append(Path(entry.path))
+                    elif entry.name == self.METADATA_FILENAME:
+                        content["meta"] = Path(entry.path)
+                    elif self._RE_GROUP.match(entry.name):
+                        if not content["group_archive"]:
+                            content["group_archive"] = Path(entry.path)
+                    elif self._RE_PROJECT.match(entry.name):
+                        content["project_archives"].append(
+                            (Path(entry.path), entry.stat().st_size))
+            tree[folder] = content
+        return tree
 
     @staticmethod
     def _write_metadata_file(obj: Union[Project, Group], filepath: Path):
@@ -421,12 +575,18 @@ class GitlabImportExport:
         assert "name" in metadata
         assert "path" in metadata
         logging.debug("writing metadata file '%s' ...", filepath.resolve())
+        if orjson:
+            filepath.write_bytes(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+            return
+        # same layout as with orjson (2-space indent, raw UTF-8)
         with filepath.open("w", encoding="utf8") as fout:
-            json.dump(metadata, fout, indent=4)
+            json.dump(metadata, fout, indent=2, ensure_ascii=False)
 
     @staticmethod
     def _read_metadata_file(filepath: Path) -> dict:
         logging.debug("loading metadata file '%s' ...", filepath)
+        if orjson:
+            return orjson.loads(filepath.read_bytes())
         with filepath.open("r", encoding="utf8") as fin:
             return json.load(fin)
 
@@ -452,6 +612,27 @@ def __setup_logging(log_file: str = None, verbose=False, no_color=False):
         logging.getLogger("").setLevel(logging.DEBUG)
 
 
+def __create_session(pool_size: int) -> requests.Session:
+    """HTTP session with a connection pool large enough for all parallel jobs."""
+    session = requests.Session()
+    # retry connection problems (only for idempotent requests, i.e., not the uploads)
+    retries = Retry(total=5, backoff_factor=0.5)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def __install_sigint_handler(gei: GitlabImportExport):
+    """On Ctrl-C stop all waiting and pending jobs (instead of just the main thread)."""
+    def on_sigint(signum, frame):  # pylint: disable=unused-argument
+        logging.warning("Interrupted! Stopping... "
+                        "(running downloads/uploads are finished first)")
+        gei.stop()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGINT, on_sigint)
+
+
 def main():
     """Run main program entry.
 
@@ -469,6 +650,7 @@ def main():
     arg_delay = float(arguments["--delay"])
     arg_nogroups = arguments["--no-groups"]
     arg_no_ssl_verify = arguments["--no-ssl-verify"]
+    arg_force = arguments["--force"]
 
     __setup_logging(arg_logfile, verbose=True, no_color=arg_nocolor)
     logging.info(version_string)
@@ -486,14 +668,15 @@ def main():
         logging.warning("Disabled TLS self-signed certificate warnings.")
         urllib3.disable_warnings()
 
-    # Gitlab API connection
+    # Gitlab API connection, one keep-alive connection per worker thread (+ main thread)
     with Gitlab(arg_host, private_token=arg_token, ssl_verify=not arg_no_ssl_verify,
-                keep_base_url=True) as gl:
+                keep_base_url=True, session=__create_session(CONCURRENCY + 1)) as gl:
 
         logging.info("Gitlab version: %s", gl.version())
         gl.auth()   # make sure we can authenticate
 
-        gei = GitlabImportExport(gl, export_folder, delay_seconds=arg_delay)
+        gei = GitlabImportExport(gl, export_folder, delay_seconds=arg_delay, force=arg_force)
+        __install_sigint_handler(gei)
 
         if arguments["export"]:
             gei.exporting(arg_root)
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the filesystem helpers of gitlab_export_import."""
+
+# pylint: disable=missing-function-docstring, redefined-outer-name, protected-access
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+from gitlab.v4.objects import GroupProject
+
+import gitlab_export_import
+from gitlab_export_import import GitlabImportExport
+
+
+@pytest.fixture
+def gei(tmp_path):
+    # the helpers under test do not talk to Gitlab
+    return GitlabImportExport(None, tmp_path, delay_seconds=4)
+
+
+@pytest.fixture
+def project():
+    return GroupProject(MagicMock(), {"id": 1, "name": "A", "path": "a",
+                                      "path_with_namespace": "main/a"})
+
+
+def _mock_gitlab_export(gei, download):
+    exporter = MagicMock(export_status="finished")
+    exporter.download.side_effect = download
+    gei.gl = MagicMock()
+    gei.gl.projects.get.return_value.exports.create.return_value = exporter
+
+
+def test_scan_export_tree(gei, tmp_path):
+    tmp_path.joinpath("metadata.json").write_text("{}")
+    tmp_path.joinpath("group_main.tar.gz").write_bytes(b"g")
+    tmp_path.joinpath("project_a.tar.gz").write_bytes(b"a" * 10)
+    tmp_path.joinpath("project_a.tar.gz.json").write_text("{}")
+    tmp_path.joinpath("project_b.tar.gz.part").write_bytes(b"partial")
+    subdir = tmp_path.joinpath("sub")
+    subdir.mkdir()
+    subdir.joinpath("metadata.json").write_text("{}")
+    subdir.joinpath("project_c.tar.gz").write_bytes(b"c" * 3)
+
+    tree = gei._scan_export_tree(tmp_path)
+
+    assert set(tree) == {tmp_path, subdir}
+    assert tree[tmp_path]["meta"] == tmp_path.joinpath("metadata.json")
+    assert tree[tmp_path]["group_archive"] == tmp_path.joinpath("group_main.tar.gz")
+    assert tree[tmp_path]["project_archives"] == [(tmp_path.joinpath("project_a.tar.gz"), 10)]
+    assert tree[subdir]["meta"] == subdir.joinpath("metadata.json")
+    assert tree[subdir]["group_archive"] is None
+    assert tree[subdir]["project_archives"] == [(subdir.joinpath("project_c.tar.gz"), 3)]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="no symlink support")
+def test_scan_export_tree_symlink_loop(gei, tmp_path):
+    subdir = tmp_path.joinpath("sub")
+    subdir.mkdir()
+    subdir.joinpath("loop").symlink_to(tmp_path, target_is_directory=True)
+
+    tree = gei._scan_export_tree(tmp_path)
+
+    assert set(tree) == {tmp_path, subdir}
+
+
+def test_is_exported(gei, tmp_path):
+    archive = tmp_path.joinpath("project_a.tar.gz")
+    metadata = tmp_path.joinpath("project_a.tar.gz.json")
+    assert not gei._is_exported(archive, metadata)
+
+    archive.write_bytes(b"a")
+    assert not gei._is_exported(archive, metadata)
+
+    metadata.write_text("{}")
+    assert gei._is_exported(archive, metadata)
+
+    gei.force = True
+    assert not gei._is_exported(archive, metadata)
+
+
+def test_is_exported_empty_archive(gei, tmp_path):
+    archive = tmp_path.joinpath("project_a.tar.gz")
+    metadata = tmp_path.joinpath("project_a.tar.gz.json")
+    archive.write_bytes(b"")
+    metadata.write_text("{}")
+    assert not gei._is_exported(archive, metadata)
+
+
+def test_export_project_download(gei, tmp_path, project):
+    def download(streamed, action, chunk_size):  # pylint: disable=unused-argument
+        action(b"archive")
+    _mock_gitlab_export(gei, download)
+
+    gei.export_project(project, tmp_path)
+
+    assert tmp_path.joinpath("project_a.tar.gz").read_bytes() == b"archive"
+    assert tmp_path.joinpath("project_a.tar.gz.json").exists()
+    assert not tmp_path.joinpath("project_a.tar.gz.part").exists()
+
+
+def test_export_project_download_failed(gei, tmp_path, project):
+    def download(streamed, action, chunk_size):  # pylint: disable=unused-argument
+        action(b"partial")
+        raise ConnectionError("connection lost")
+    _mock_gitlab_export(gei, download)
+
+    gei.export_project(project, tmp_path)
+
+    # neither a (partial) archive nor a metadata file, i.e., exported again on the next run
+    assert not list(tmp_path.iterdir())
+
+
+def test_import_project_without_metadata(gei, tmp_path, monkeypatch, caplog):
+    archive = tmp_path.joinpath("project_a.tar.gz")
+    archive.write_bytes(b"a")
+    imports = []
+    monkeypatch.setattr(gei, "import_project", lambda *args: imports.append(args))
+
+    gei._import_project(archive, "main", 1, set())
+
+    assert not imports
+    assert "without metadata file" in caplog.text
+
+
+@pytest.mark.skipif(gitlab_export_import.orjson is None, reason="orjson not installed")
+def test_metadata_file_same_with_and_without_orjson(tmp_path, project, monkeypatch):
+    project.full_name = "Gruppe Ä / A"
+    GitlabImportExport._write_metadata_file(project, tmp_path.joinpath("orjson.json"))
+    monkeypatch.setattr(gitlab_export_import, "orjson", None)
+    GitlabImportExport._write_metadata_file(project, tmp_path.joinpath("json.json"))
+
+    assert tmp_path.joinpath("orjson.json").read_bytes() == tmp_path.joinpath("json.json").read_bytes()
+    assert GitlabImportExport._read_metadata_file(tmp_path.joinpath("orjson.json"))["full_name"] == "Gruppe Ä / A"
+
+
+def test_wait_until_backoff_capped(gei, monkeypatch):
+    delays = []
+    monkeypatch.setattr(gei, "_sleep", delays.append)
+    refreshes = []
+
+    gei._wait_until(lambda: len(refreshes) >= 6, lambda: refreshes.append(1))
+
+    assert len(delays) == 6
+    # 1, 2, 4, then capped at delay_seconds=4 (each with +-20% jitter)
+    for delay, expected in zip(delays, (1, 2, 4, 4, 4, 4)):
+        assert expected * 0.8 <= delay <= expected * 1.2
+
+
+def test_wait_until_done_without_waiting(gei, monkeypatch):
+    delays = []
+    monkeypatch.setattr(gei, "_sleep", delays.append)
+    gei._wait_until(lambda: True, lambda: None)
+    assert not delays
+
+
+def test_wait_until_stopped(gei):
+    gei.stop()
+    with pytest.raises(KeyboardInterrupt):
+        gei._wait_until(lambda: False, lambda: None)
+
+
+def test_wait_all_cancels_queued_jobs(gei):
+    gei._pool = ThreadPoolExecutor(max_workers=1)
+    release = threading.Event()
+    failed = Future()
+    failed.set_exception(ValueError("failed"))
+    # the only worker is busy, so the next job stays queued
+    running = gei._pool.submit(release.wait, 10)
+    queued = gei._pool.submit(lambda: None)
+
+    try:
+        with pytest.raises(ValueError):
+            gei._wait_all([failed, running, queued])
+        assert queued.cancelled()
+        assert gei._stop.is_set()
+    finally:
+        release.set()
+
+
+def test_exporting_group_failure_not_delayed(gei, monkeypatch):
+    monkeypatch.setattr(gei, "get_group", lambda path: MagicMock(path="main"))
+
+    def export_group(group, output_path):
+        raise AttributeError("no exporter")
+
+    def export_group_tree(group, output_path, futures):
+        # a long-running project export, only ending when stopped
+        futures.append(gei._pool.submit(gei._stop.wait, 10))
+    monkeypatch.setattr(gei, "_export_group", export_group)
+    monkeypatch.setattr(gei, "_export_group_tree", export_group_tree)
+
+    with pytest.raises(AttributeError):
+        gei.exporting("main")
+    assert gei._stop.is_set()
+
+
+def test_importing_reads_root_metadata_once(gei, tmp_path, monkeypatch):
+    tmp_path.joinpath("metadata.json").write_text('{"name": "Main", "path": "main"}')
+    tmp_path.joinpath("project_a.tar.gz").write_bytes(b"a")
+    reads = []
+    read_metadata_file = gei._read_metadata_file
+
+    def read_metadata_file_counted(path):
+        reads.append(path)
+        return read_metadata_file(path)
+    monkeypatch.setattr(gei, "_read_metadata_file", read_metadata_file_counted)
+    monkeypatch.setattr(gei, "get_group", lambda path: None)
+    imports = []
+    monkeypatch.setattr(gei, "_import_project", lambda *args: imports.append(args))
+
+    gei.importing("root", no_groups=True)
+
+    assert reads == [tmp_path.joinpath("metadata.json")]
+    assert imports == [(tmp_path.joinpath("project_a.tar.gz"), "root/main", 1, set())]